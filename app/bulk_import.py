@@ -0,0 +1,236 @@
+# bulk_import.py
+"""
+Bulk importer for a directory of PDFs.
+
+    python -m app.bulk_import /data/pdfs --out-dir ./vector_store --workers 8
+
+Extraction, language detection, chunking and translation (skipped when
+EMBEDDING_MODE=multilingual) run across a process pool; the main process embeds
+in large batches, writes each batch of chunks to the DB in one transaction and
+appends its vectors as a shard under --out-dir.
+Point VECTOR_STORE_DIR at the same directory so the API loads the shards.
+
+Progress is checkpointed after every batch, so re-running the same command
+after an interruption resumes where it stopped.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from tqdm import tqdm
+
+# Only light imports at module level: spawned workers re-import this module.
+from app.ingest import embedding_text, process_pdf_file
+
+CHECKPOINT_NAME = "checkpoint.json"
+
+
+class Checkpoint:
+    """
+    done       - PDF paths (relative to the import root) that are fully handled
+    failed     - PDF paths whose last attempt failed; not in `done`, so they are
+                 retried on the next run
+    next_shard - number of the next vector shard to write
+    pending    - paper ids of a batch that was started but not checkpointed;
+                 on resume their DB rows are removed and the batch is redone
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = set()
+        self.failed = set()
+        self.next_shard = 0
+        self.pending: List[str] = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.done = set(data.get("done", []))
+            self.failed = set(data.get("failed", []))
+            self.next_shard = data.get("next_shard", 0)
+            self.pending = data.get("pending", [])
+
+    def save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"done": sorted(self.done), "failed": sorted(self.failed),
+                       "next_shard": self.next_shard, "pending": self.pending}, f)
+        os.replace(tmp, self.path)
+
+    def mark(self, results: Iterable[Dict[str, Any]], root: str) -> None:
+        """Record the outcome of a flushed batch. Failures stay out of `done`."""
+        for res in results:
+            rel = os.path.relpath(res["path"], root)
+            if res.get("error"):
+                self.failed.add(rel)
+            else:
+                self.done.add(rel)
+                self.failed.discard(rel)
+
+
+def rollback_pending(db, ckpt: Checkpoint, shard_prefix: str) -> int:
+    """
+    Undo a batch that was interrupted before it was checkpointed: delete its
+    papers and chunks and the (possibly partial) shard at `shard_prefix`.
+    Returns the number of papers removed.
+    """
+    from app.models import Paper, PaperChunk
+
+    ids = [row.id for row in db.query(Paper.id).filter(Paper.paper_id.in_(ckpt.pending))]
+    if ids:
+        db.query(PaperChunk).filter(PaperChunk.paper_id_fk.in_(ids)).delete(synchronize_session=False)
+        db.query(Paper).filter(Paper.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+    for ext in (".npy", ".jsonl"):
+        if os.path.exists(shard_prefix + ext):
+            os.remove(shard_prefix + ext)
+    ckpt.pending = []
+    ckpt.save()
+    return len(ids)
+
+
+def find_pdfs(root: str) -> List[str]:
+    found = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.lower().endswith(".pdf"):
+                found.append(os.path.join(dirpath, name))
+    return sorted(found)
+
+
+def bounded_map(pool, fn, items: Iterable[str], max_in_flight: int) -> Iterator[Tuple[str, Any]]:
+    """Like pool.map but keeps at most `max_in_flight` tasks queued, so results never pile up in memory."""
+    in_flight = deque()
+    for item in items:
+        in_flight.append((item, pool.submit(fn, item)))
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft()
+    while in_flight:
+        yield in_flight.popleft()
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Bulk-import a directory of PDFs into the DB and vector store.")
+    p.add_argument("directory", help="directory searched recursively for *.pdf")
+    p.add_argument("--out-dir", default=os.getenv("VECTOR_STORE_DIR") or "vector_store",
+                   help="where vector shards and the checkpoint are written (default: $VECTOR_STORE_DIR)")
+    p.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                   help="extract/chunk processes; each loads its own translation models")
+    p.add_argument("--batch-chunks", type=int, default=8192,
+                   help="chunks per DB transaction / vector shard / checkpoint")
+    p.add_argument("--embed-batch-size", type=int, default=128, help="texts per model forward pass")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> Dict[str, int]:
+    args = parse_args(argv)
+    os.makedirs(args.out_dir, exist_ok=True)
+    ckpt = Checkpoint(os.path.join(args.out_dir, CHECKPOINT_NAME))
+
+    from app.chunk_store import store_chunks
+    from app.database import SessionLocal
+    from app.embeddings import MULTILINGUAL, encode_texts, write_shard
+    from app.init_db import init_db
+    from app.models import Paper
+
+    init_db()
+    db = SessionLocal()
+
+    def shard_prefix(n: int) -> str:
+        return os.path.join(args.out_dir, f"shard_{n:06d}")
+
+    if ckpt.pending:
+        removed = rollback_pending(db, ckpt, shard_prefix(ckpt.next_shard))
+        print(f"resume: rolled back {removed} papers from an interrupted batch")
+
+    root = os.path.abspath(args.directory)
+    todo = [p for p in find_pdfs(root) if os.path.relpath(p, root) not in ckpt.done]
+    print(f"{len(ckpt.done)} PDFs already imported, {len(todo)} to go ({len(ckpt.failed)} retried after failing)")
+
+    stats = {"papers": 0, "chunks": 0, "duplicates": 0, "failed": 0}
+    t0 = time.perf_counter()
+    bar = tqdm(total=len(todo), unit="pdf")
+
+    def flush(batch: List[Dict[str, Any]]) -> None:
+        new, seen = [], set()
+        for res in batch:
+            if res.get("error") or not res["records"]:
+                continue
+            pid = res["paper_id"]
+            if pid in seen or db.query(Paper.id).filter(Paper.paper_id == pid).first():
+                stats["duplicates"] += 1
+                continue
+            seen.add(pid)
+            new.append(res)
+
+        if new:
+            ckpt.pending = [res["paper_id"] for res in new]
+            ckpt.save()
+
+            texts = [embedding_text(rec, MULTILINGUAL) for res in new for rec in res["records"]]
+            embeddings = encode_texts(texts, batch_size=args.embed_batch_size)
+
+            metas = []
+            for res in new:
+                paper = Paper(paper_id=res["paper_id"], title=res["title"][:512], source="bulk")
+                db.add(paper)
+                db.flush()
+                metas.extend(store_chunks(db, paper, res["records"]))
+            db.commit()
+
+            write_shard(shard_prefix(ckpt.next_shard), embeddings, texts, metas)
+            ckpt.next_shard += 1
+            stats["papers"] += len(new)
+            stats["chunks"] += len(texts)
+
+        ckpt.mark(batch, root)
+        ckpt.pending = []
+        ckpt.save()
+
+        elapsed = time.perf_counter() - t0
+        bar.set_postfix(papers_s=f"{stats['papers'] / elapsed:.1f}", chunks_s=f"{stats['chunks'] / elapsed:.0f}",
+                        failed=stats["failed"], dup=stats["duplicates"])
+
+    ctx = multiprocessing.get_context("spawn")  # fork + torch threads can deadlock
+    batch: List[Dict[str, Any]] = []
+    batch_chunks = 0
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=ctx) as pool:
+        work = partial(process_pdf_file, translate=not MULTILINGUAL)
+        for path, fut in bounded_map(pool, work, todo, max_in_flight=args.workers * 4):
+            try:
+                res = fut.result()
+            except Exception as e:
+                res = {"path": path, "paper_id": None, "records": [], "error": str(e)}
+            if res.get("error"):
+                stats["failed"] += 1
+                tqdm.write(f"skip {path}: {res['error']}")
+
+            batch.append(res)
+            batch_chunks += len(res["records"])
+            bar.update(1)
+            if batch_chunks >= args.batch_chunks:
+                flush(batch)
+                batch, batch_chunks = [], 0
+
+        if batch:
+            flush(batch)
+
+    bar.close()
+    db.close()
+
+    elapsed = time.perf_counter() - t0
+    print(
+        f"imported {stats['papers']} papers / {stats['chunks']} chunks in {elapsed:.1f}s "
+        f"({stats['chunks'] / max(elapsed, 1e-9):.0f} chunks/s); "
+        f"{stats['duplicates']} duplicates, {stats['failed']} failed"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -11,4 +11,4 @@ class PaperChunk:
     page_end: Optional[int]
     lang: str
     text_original: str
-    text_en: str  # if lang != en, translated text; else same as original
+    text_en: Optional[str]  # if lang != en, translated text; else same as original. None = not translated yet (multilingual mode)
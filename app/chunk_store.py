@@ -0,0 +1,45 @@
+# chunk_store.py
+"""DB writes for ingested chunks, shared by the /upload route and the bulk importer."""
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.embeddings import VectorItem
+from app.ingest import ChunkRecord
+from app.models import Paper, PaperChunk
+
+
+def store_chunks(db: Session, paper: Paper, records: List[ChunkRecord]) -> List[VectorItem]:
+    """
+    Add chunk rows for `paper` in one flush (caller commits) and return the
+    matching vector-store metadata. We use chunk_id as the embedding id.
+    """
+    rows = [
+        PaperChunk(
+            paper_id_fk=paper.id,
+            chunk_id=r.chunk_id,
+            section=r.section,
+            page_start=r.page_start,
+            page_end=r.page_end,
+            lang=r.lang,
+            text_original=r.text_original,
+            text_en=r.text_en,
+            embedding_id=r.chunk_id,
+        )
+        for r in records
+    ]
+    db.add_all(rows)
+    db.flush()  # assigns primary keys
+
+    return [
+        VectorItem(
+            chunk_db_id=row.id,
+            paper_id=paper.paper_id,
+            chunk_id=row.chunk_id,
+            section=row.section,
+            page_start=row.page_start,
+            page_end=row.page_end,
+            lang=row.lang,
+        )
+        for row in rows
+    ]
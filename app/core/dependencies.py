@@ -0,0 +1,59 @@
+from typing import Optional
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.security import decode_token_claims, token_cache
+from app.database import SessionLocal
+from app.metrics import CACHE_HITS, CACHE_MISSES
+from app.models import User
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=401, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+
+def _user_exists(user_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        return db.query(User.id).filter(User.id == user_id).first() is not None
+    finally:
+        db.close()
+
+
+async def _resolve_user_id(token: str) -> int:
+    # Cache hit: no JWT decode and no DB round trip
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        CACHE_HITS.inc(cache="auth_token")
+        return user_id
+
+    CACHE_MISSES.inc(cache="auth_token")
+    try:
+        user_id, exp = decode_token_claims(token)
+    except JWTError:
+        raise _unauthorized("Invalid or expired token")
+
+    if not await run_in_threadpool(_user_exists, user_id):
+        raise _unauthorized("User no longer exists")
+
+    token_cache.put(token, user_id, exp)
+    return user_id
+
+
+async def get_current_user_id(creds: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> int:
+    """Require a valid bearer token; returns the user id."""
+    if creds is None:
+        raise _unauthorized("Not authenticated")
+    return await _resolve_user_id(creds.credentials)
+
+
+async def get_optional_user_id(creds: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme)) -> Optional[int]:
+    """Like get_current_user_id, but anonymous requests get None. A bad token is still rejected."""
+    if creds is None:
+        return None
+    return await _resolve_user_id(creds.credentials)
@@ -1,6 +1,13 @@
+import asyncio
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from jose import jwt
+from typing import Optional, Tuple
+
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 from dotenv import load_dotenv
 
@@ -12,6 +19,14 @@ JWT_SECRET = os.getenv("JWT_SECRET", "CHANGE_ME")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
 
+# bcrypt runs on its own small pool so login bursts can't take over the
+# threadpool that serves sync endpoints like /ask.
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "2"))
+BCRYPT_MAX_PENDING = int(os.getenv("BCRYPT_MAX_PENDING", "64"))
+
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -22,3 +37,85 @@ def create_access_token(user_id: int) -> str:
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     payload = {"sub": str(user_id), "exp": expire}
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+def decode_access_token(token: str) -> int:
+    """Verify signature and expiry; returns the user id. Raises JWTError if invalid."""
+    user_id, _ = decode_token_claims(token)
+    return user_id
+
+
+def decode_token_claims(token: str) -> Tuple[int, float]:
+    """Verify a token and return (user_id, exp as a unix timestamp). Raises JWTError if invalid."""
+    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    try:
+        return int(payload["sub"]), float(payload["exp"])
+    except (KeyError, TypeError, ValueError):
+        raise JWTError("token is missing sub/exp")
+
+
+# ---------- bcrypt offloading ----------
+class BcryptBusy(Exception):
+    """Raised when too many bcrypt operations are already queued."""
+
+
+_bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_bcrypt_slots = threading.BoundedSemaphore(BCRYPT_MAX_PENDING)
+
+
+async def _run_bcrypt(fn, *args):
+    if not _bcrypt_slots.acquire(blocking=False):
+        raise BcryptBusy()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_bcrypt_executor, fn, *args)
+    finally:
+        _bcrypt_slots.release()
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_bcrypt(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await _run_bcrypt(verify_password, password, hashed)
+
+
+# ---------- verified-token cache ----------
+class TokenCache:
+    """
+    token -> user id for tokens that were verified (and whose user existed)
+    recently. Entries live for `ttl` seconds, never past the token's own exp.
+    """
+
+    def __init__(self, ttl: float = AUTH_CACHE_TTL_SECONDS, max_entries: int = AUTH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[int]:
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is None:
+                return None
+            user_id, expires_at = entry
+            if expires_at <= now:
+                del self._data[token]
+                return None
+            return user_id
+
+    def put(self, token: str, user_id: int, token_exp: float) -> None:
+        expires_at = min(time.time() + self.ttl, token_exp)
+        with self._lock:
+            self._data[token] = (user_id, expires_at)
+            self._data.move_to_end(token)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+token_cache = TokenCache()
@@ -1,19 +1,50 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Optional, Tuple, Dict, Any
+import glob
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Iterable, List, Optional, Tuple, Dict, Any
 
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
-_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+from app.encoding_service import BatchingEncoder, load_backend
+from app.metrics import INDEX_SIZE, stage
+
+# english      - non-English chunks are translated at ingest and text_en is embedded
+# multilingual - text_original is embedded with a cross-lingual model; translation is
+#                deferred until a chunk is actually shown or sent to the LLM (app.lazy_translation)
+# Both models are 384-d, but their vectors are not compatible: re-index after switching.
+EMBEDDING_MODE = os.getenv("EMBEDDING_MODE", "english")
+_MODEL_NAMES = {
+    "english": "sentence-transformers/all-MiniLM-L6-v2",
+    "multilingual": "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+}
+if EMBEDDING_MODE not in _MODEL_NAMES:
+    raise RuntimeError(f"EMBEDDING_MODE must be one of {sorted(_MODEL_NAMES)}, got {EMBEDDING_MODE!r}")
+MULTILINGUAL = EMBEDDING_MODE == "multilingual"
+
+_MODEL_NAME = _MODEL_NAMES[EMBEDDING_MODE]
 model = SentenceTransformer(_MODEL_NAME)
 
+# Query encoding goes through a micro-batcher so concurrent /ask calls share forward passes.
+ENCODER_BACKEND = os.getenv("ENCODER_BACKEND", "torch")  # torch | quantized | onnx
+ENCODER_MAX_BATCH = int(os.getenv("ENCODER_MAX_BATCH", "32"))
+ENCODER_MAX_WAIT_MS = float(os.getenv("ENCODER_MAX_WAIT_MS", "2"))
+
+query_encoder = BatchingEncoder(
+    load_backend(ENCODER_BACKEND, model, _MODEL_NAME),
+    max_batch_size=ENCODER_MAX_BATCH,
+    max_wait_ms=ENCODER_MAX_WAIT_MS,
+)
+
 
 @dataclass
 class VectorItem:
-    chunk_db_id: int
+    chunk_db_id: Optional[int]  # None for chunks that only live in memory (Streamlit sessions)
     paper_id: str
     chunk_id: str
     section: str = "unknown"
@@ -28,6 +59,11 @@ class VectorStore:
         self.index = faiss.IndexFlatIP(dim)
         self.items: List[VectorItem] = []
         self.texts: List[str] = []   # ✅ store chunk texts in same order
+        self._positions: Dict[int, int] = {}  # chunk_db_id -> row in the index
+        self._paper_positions: Dict[str, List[int]] = {}  # paper_id -> rows in the index
+        # Guards the index and the bookkeeping above: the store can be shared across
+        # threads (Streamlit sessions, API workers) and faiss doesn't allow add during search.
+        self._lock = threading.Lock()
 
     @staticmethod
     def _normalize(vectors: np.ndarray) -> np.ndarray:
@@ -40,35 +76,124 @@ class VectorStore:
         if not texts:
             return
 
-        embeddings = model.encode(texts, show_progress_bar=False)
-        embeddings = np.asarray(embeddings, dtype="float32")
-        embeddings = self._normalize(embeddings)
+        with stage("vector_store.encode"):
+            embeddings = encode_texts(texts)
+
+        self.add_embeddings(embeddings, texts, metadatas)
 
-        self.index.add(embeddings)
-        self.items.extend(metadatas)
-        self.texts.extend(texts)
+    def add_embeddings(self, embeddings: np.ndarray, texts: List[str], metadatas: List[VectorItem]) -> None:
+        """Append already-normalized vectors (e.g. from `encode_texts`)."""
+        if not (len(embeddings) == len(texts) == len(metadatas)):
+            raise ValueError("embeddings, texts and metadatas must have the same length")
+        if not texts:
+            return
 
-    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        """Returns list of {score, text, metadata}"""
+        embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+        with self._lock:
+            start = self.index.ntotal
+            with stage("vector_store.index_add"):
+                self.index.add(embeddings)
+            for pos, m in enumerate(metadatas, start=start):
+                if m.chunk_db_id is not None:
+                    self._positions[m.chunk_db_id] = pos
+                self._paper_positions.setdefault(m.paper_id, []).append(pos)
+            self.items.extend(metadatas)
+            self.texts.extend(texts)
+
+    def load_shards(self, directory: str) -> int:
+        """Append every shard written by `write_shard` in `directory` (in name order). Returns vectors added."""
+        added = 0
+        for vec_path in sorted(glob.glob(os.path.join(directory, "shard_*.npy"))):
+            meta_path = vec_path[:-len(".npy")] + ".jsonl"
+            if not os.path.exists(meta_path):
+                continue  # interrupted write; the importer redoes this batch on resume
+            embeddings = np.load(vec_path, allow_pickle=False)
+            texts: List[str] = []
+            items: List[VectorItem] = []
+            with open(meta_path, encoding="utf-8") as f:
+                for line in f:
+                    row = json.loads(line)
+                    texts.append(row["text"])
+                    items.append(VectorItem(**row["item"]))
+            if len(texts) != len(embeddings):
+                raise ValueError(f"shard {vec_path} has {len(embeddings)} vectors but {len(texts)} metadata rows")
+            self.add_embeddings(embeddings, texts, items)
+            added += len(texts)
+        return added
+
+    def vector_for(self, chunk_db_id: int) -> Optional[np.ndarray]:
+        """The stored (normalized) vector of a DB chunk, or None if it is not indexed."""
+        with self._lock:
+            pos = self._positions.get(chunk_db_id)
+            if pos is None:
+                return None
+            return self.index.reconstruct(pos)
+
+    def search(self, query: str, top_k: int = 5, paper_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Returns list of {score, text, metadata}; `paper_ids` restricts the search to those papers."""
         if len(self.items) == 0:
             return []
 
-        q = model.encode([query], show_progress_bar=False)
-        q = np.asarray(q, dtype="float32")
-        q = self._normalize(q)
-
-        scores, idxs = self.index.search(q, top_k)
+        # encode outside the lock so concurrent queries can still be micro-batched
+        with stage("vector_store.encode_query"):
+            q = np.array(query_encoder.encode(query), dtype="float32").reshape(1, -1)
+            q = self._normalize(q)
 
         results: List[Dict[str, Any]] = []
-        for score, idx in zip(scores[0].tolist(), idxs[0].tolist()):
-            if 0 <= idx < len(self.items):
-                results.append({
-                    "score": float(score),
-                    "text": self.texts[idx],
-                    "metadata": self.items[idx],
-                })
+        with self._lock:
+            params = None
+            if paper_ids is not None:
+                positions = [p for pid in paper_ids for p in self._paper_positions.get(pid, [])]
+                if not positions:
+                    return []
+                allowed = np.asarray(positions, dtype="int64")
+                params = faiss.SearchParameters()
+                params.sel = faiss.IDSelectorBatch(len(allowed), faiss.swig_ptr(allowed))
+
+            with stage("vector_store.search"):
+                if params is None:
+                    scores, idxs = self.index.search(q, top_k)
+                else:
+                    scores, idxs = self.index.search(q, top_k, params=params)
+
+            for score, idx in zip(scores[0].tolist(), idxs[0].tolist()):
+                if 0 <= idx < len(self.items):
+                    results.append({
+                        "score": float(score),
+                        "text": self.texts[idx],
+                        "metadata": self.items[idx],
+                    })
         return results
 
 
+def encode_texts(texts: List[str], batch_size: int = 32) -> np.ndarray:
+    """Encode chunk texts with the shared model; returns L2-normalized float32 vectors."""
+    embeddings = model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+    embeddings = np.asarray(embeddings, dtype="float32")
+    return VectorStore._normalize(embeddings)
+
+
+def write_shard(path_prefix: str, embeddings: np.ndarray, texts: List[str], metadatas: List[VectorItem]) -> None:
+    """
+    Persist one append-only batch as `<prefix>.npy` (vectors) and `<prefix>.jsonl`
+    (one {"text", "item"} row per vector). Each file is written to a temp file and
+    renamed, and the .jsonl goes last, so a shard is only loaded once complete.
+    """
+    vec_tmp = path_prefix + ".npy.tmp"
+    with open(vec_tmp, "wb") as f:
+        np.save(f, np.asarray(embeddings, dtype="float32"), allow_pickle=False)
+    os.replace(vec_tmp, path_prefix + ".npy")
+
+    meta_tmp = path_prefix + ".jsonl.tmp"
+    with open(meta_tmp, "w", encoding="utf-8") as f:
+        for text, m in zip(texts, metadatas):
+            f.write(json.dumps({"text": text, "item": asdict(m)}, ensure_ascii=False) + "\n")
+    os.replace(meta_tmp, path_prefix + ".jsonl")
+
+
 # Global store instance
 vector_store = VectorStore(dim=384)
+
+# Directory of shards produced by the bulk importer; loaded at app startup
+VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR")
+INDEX_SIZE.set_function(lambda: vector_store.index.ntotal)
@@ -0,0 +1,119 @@
+# encoding_service.py
+"""
+Dynamic micro-batching for query encoding.
+
+Concurrent callers of `BatchingEncoder.encode()` are collected for up to
+`max_wait_ms` (or until `max_batch_size` is reached) and encoded in a single
+forward pass on a background thread; each caller then gets its own row back.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.metrics import ENCODE_BATCH_SIZE, stage
+
+EncodeFn = Callable[[List[str]], np.ndarray]
+
+
+class BatchingEncoder:
+    def __init__(self, encode_fn: EncodeFn, max_batch_size: int = 32, max_wait_ms: float = 2.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def encode(self, text: str, timeout: Optional[float] = None) -> np.ndarray:
+        """Encode one text; blocks until its batch has been run. Returns a float32 vector."""
+        self._ensure_started()
+        fut: Future = Future()
+        self._queue.put((text, fut))
+        return fut.result(timeout)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="query-encoder", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                with stage("encoder.batch"):
+                    vectors = np.asarray(self.encode_fn([text for text, _ in batch]), dtype="float32")
+                if len(vectors) != len(batch):
+                    raise RuntimeError(f"encoder returned {len(vectors)} vectors for {len(batch)} inputs")
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+
+            ENCODE_BATCH_SIZE.observe(len(batch))
+            for (_, fut), vec in zip(batch, vectors):
+                fut.set_result(vec)
+
+
+# ---------- backends ----------
+def load_backend(name: str, model, model_name: str) -> EncodeFn:
+    """
+    Build the encode function used for queries.
+      torch     - the shared SentenceTransformer as-is
+      quantized - int8 dynamic quantization of its Linear layers (CPU)
+      onnx      - ONNX Runtime export via optimum (optional dependency),
+                  mean-pooled like the sentence-transformers models we use
+    """
+    if name == "torch":
+        return lambda texts: model.encode(texts, batch_size=len(texts), show_progress_bar=False)
+
+    if name == "quantized":
+        import torch
+
+        qmodel = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return lambda texts: qmodel.encode(texts, batch_size=len(texts), show_progress_bar=False)
+
+    if name == "onnx":
+        return _onnx_backend(model_name, max_length=model.max_seq_length)
+
+    raise ValueError(f"Unknown encoder backend: {name!r} (expected torch, quantized or onnx)")
+
+
+def _onnx_backend(model_name: str, max_length: int = 256) -> EncodeFn:
+    try:
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+    except ImportError as e:
+        raise RuntimeError("ENCODER_BACKEND=onnx requires `pip install optimum[onnxruntime]`") from e
+
+    tok = AutoTokenizer.from_pretrained(model_name)
+    ort_model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+
+    def encode(texts: List[str]) -> np.ndarray:
+        batch = tok(texts, padding=True, truncation=True, max_length=max_length, return_tensors="np")
+        hidden = np.asarray(ort_model(**batch).last_hidden_state)
+        # mean pooling over real tokens
+        mask = batch["attention_mask"][..., None].astype("float32")
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    return encode
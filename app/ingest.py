@@ -0,0 +1,129 @@
+# ingest.py
+"""
+PDF -> chunk pipeline stages shared by the /upload route and the bulk importer.
+
+Kept free of database and embedding-model imports so it can run inside
+worker processes cheaply.
+"""
+import hashlib
+import os
+from typing import Any, Dict, List
+
+import fitz  # PyMuPDF
+
+from app.chunk_schema import PaperChunk as ChunkRecord
+from app.language_utils import detect_language
+from app.metrics import stage
+from app.translator import TranslatorToEnglish
+
+translator = TranslatorToEnglish()  # Marian models load lazily on first use per language
+
+MIN_TEXT_CHARS = 200
+
+
+def extract_text_by_page(pdf_bytes: bytes) -> List[str]:
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    pages = []
+    for i in range(len(doc)):
+        text = doc[i].get_text("text") or ""
+        pages.append(text.strip())
+    return pages
+
+
+def simple_chunk(text: str, max_chars: int = 1200, overlap: int = 200) -> List[str]:
+    """
+    Simple character chunker (robust & fast). Later we can upgrade to token-based.
+    """
+    text = " ".join((text or "").split())
+    if not text:
+        return []
+
+    chunks = []
+    start = 0
+    n = len(text)
+    while start < n:
+        end = min(start + max_chars, n)
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end == n:
+            break
+        start = end - overlap
+        if start < 0:
+            start = 0
+        if start >= n:
+            break
+    return chunks
+
+
+def build_chunks(pages: List[str], paper_id: str, translate: bool = True) -> List[ChunkRecord]:
+    """
+    Language-detect, chunk and translate pages. Chunks are page-wise so
+    citations can carry page numbers; chunk ids are "{paper_id}_{n:04d}".
+    With translate=False non-English chunks get text_en=None (filled in lazily later).
+    """
+    records: List[ChunkRecord] = []
+    for page_idx, page_text in enumerate(pages, start=1):
+        if not page_text:
+            continue
+
+        # detect language on the page text (good enough + faster)
+        with stage("upload.langdetect"):
+            lang = detect_language(page_text, default="en")
+
+        with stage("upload.chunk"):
+            chunks = simple_chunk(page_text)
+        for ch in chunks:
+            if lang == "en":
+                text_en = ch
+            elif translate:
+                with stage("upload.translate"):
+                    text_en = translator.translate(ch, lang)
+            else:
+                text_en = None
+
+            records.append(
+                ChunkRecord(
+                    paper_id=paper_id,
+                    chunk_id=f"{paper_id}_{len(records) + 1:04d}",
+                    section="unknown",
+                    page_start=page_idx,
+                    page_end=page_idx,
+                    lang=lang,
+                    text_original=ch,
+                    text_en=text_en,
+                )
+            )
+    return records
+
+
+def embedding_text(record: ChunkRecord, multilingual: bool) -> str:
+    """The text we embed: the original in multilingual mode, otherwise the English text."""
+    if multilingual or record.text_en is None:
+        return record.text_original
+    return record.text_en
+
+
+def process_pdf_file(path: str, translate: bool = True) -> Dict[str, Any]:
+    """
+    Bulk-import worker: read, extract and chunk one PDF. The paper id is a
+    content hash, so re-importing the same file is detected as a duplicate.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    paper_id = hashlib.sha1(data).hexdigest()[:12]
+    result: Dict[str, Any] = {"path": path, "paper_id": paper_id, "title": os.path.basename(path), "pages": 0, "records": []}
+
+    try:
+        pages = extract_text_by_page(data)
+    except Exception as e:
+        result["error"] = f"extract failed: {e}"
+        return result
+
+    result["pages"] = len(pages)
+    if len("\n".join(p for p in pages if p)) < MIN_TEXT_CHARS:
+        result["error"] = "not enough text"
+        return result
+
+    result["records"] = build_chunks(pages, paper_id, translate=translate)
+    return result
@@ -0,0 +1,69 @@
+# lazy_translation.py
+"""
+Deferred translation for the multilingual embedding mode.
+
+Chunks ingested without translation have `PaperChunk.text_en = NULL`. They are
+translated only when they are shown as a citation or sent to the LLM, and the
+result is written back so each chunk is translated at most once. Chunks that
+are not in the DB (Streamlit sessions) are cached in memory instead.
+
+The DB modules are imported lazily so the Streamlit app can run without
+DATABASE_URL.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from app import ingest
+from app.metrics import CACHE_HITS, CACHE_MISSES, stage
+
+
+def ensure_english(db, chunks: List[Any]) -> None:
+    """Fill in text_en for any of `chunks` that lack it, and commit once."""
+    missing = [c for c in chunks if c.text_en is None]
+    CACHE_HITS.inc(len(chunks) - len(missing), cache="text_en")
+    if not missing:
+        return
+
+    CACHE_MISSES.inc(len(missing), cache="text_en")
+    for c in missing:
+        with stage("lazy_translate"):
+            c.text_en = ingest.translator.translate(c.text_original, c.lang) if c.lang != "en" else c.text_original
+    db.commit()
+
+
+def english_texts(chunk_db_ids: List[int]) -> Dict[int, str]:
+    """Return {chunk_db_id: text_en} for the given chunks, translating on demand."""
+    if not chunk_db_ids:
+        return {}
+    from app.database import SessionLocal
+    from app.models import PaperChunk
+
+    db = SessionLocal()
+    try:
+        chunks = db.query(PaperChunk).filter(PaperChunk.id.in_(chunk_db_ids)).all()
+        ensure_english(db, chunks)
+        return {c.id: c.text_en for c in chunks}
+    finally:
+        db.close()
+
+
+@lru_cache(maxsize=4096)
+def _translate_cached(text: str, lang: str) -> str:
+    with stage("lazy_translate"):
+        return ingest.translator.translate(text, lang)
+
+
+def translate_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return copies of VectorStore.search results with English `text`."""
+    texts = english_texts([r["metadata"].chunk_db_id for r in results if r["metadata"].chunk_db_id is not None])
+    out = []
+    for r in results:
+        meta = r["metadata"]
+        if meta.chunk_db_id is not None:
+            text = texts.get(meta.chunk_db_id, r["text"])
+        elif meta.lang != "en":
+            text = _translate_cached(r["text"], meta.lang)
+        else:
+            text = r["text"]
+        out.append({**r, "text": text})
+    return out
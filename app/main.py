@@ -1,6 +1,13 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from app.embeddings import VECTOR_STORE_DIR, vector_store
 from app.init_db import init_db
+from app.metrics import HTTP_REQUEST_SECONDS, end_profile, render_prometheus, server_timing_header, start_profile
 from app.routes.papers import router as papers_router
+from app.routes.export import router as export_router
+from app.routes.auth import router as auth_router
 from dotenv import load_dotenv
 import os
 
@@ -17,8 +24,41 @@ app = FastAPI(title="Scientific Literature Explorer API")
 @app.on_event("startup")
 def on_startup():
     init_db()
+    if VECTOR_STORE_DIR and os.path.isdir(VECTOR_STORE_DIR):
+        vector_store.load_shards(VECTOR_STORE_DIR)
 
 app.include_router(papers_router)
+app.include_router(export_router)
+app.include_router(auth_router)
+
+
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    # Opt-in stage breakdown: send `X-Profile: 1` to get a Server-Timing header back.
+    profiling = request.headers.get("x-profile", "").lower() in ("1", "true", "yes")
+    token = start_profile() if profiling else None
+
+    t0 = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        profile = end_profile(token) if token is not None else None
+    dt = time.perf_counter() - t0
+
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    HTTP_REQUEST_SECONDS.observe(dt, method=request.method, path=path, status=response.status_code)
+
+    if profile is not None:
+        profile["total"] = [dt, 1]
+        response.headers["Server-Timing"] = server_timing_header(profile)
+    return response
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 
 @app.get("/")
 def root():
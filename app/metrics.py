@@ -0,0 +1,214 @@
+# metrics.py
+"""
+Lightweight in-process metrics with Prometheus text export.
+
+Counters, gauges and histograms live in a module-level registry and are
+rendered by `render_prometheus()` for the `/metrics` endpoint. `stage()` times
+a block into STAGE_SECONDS and, when the current request opted in to
+profiling, also records it into that request's stage breakdown.
+"""
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines (without HELP/TYPE) in Prometheus text format."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        k = _key(labels)
+        with self._lock:
+            self._values[k] = self._values.get(k, 0.0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_fmt_labels(k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+        self._fn: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[_key(labels)] = float(value)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Evaluate `fn` at scrape time instead of storing a value."""
+        self._fn = fn
+
+    def _samples(self) -> List[str]:
+        if self._fn is not None:
+            try:
+                return [f"{self.name} {_fmt_value(self._fn())}"]
+            except Exception:
+                return []
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_fmt_labels(k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[LabelKey, Tuple[List[int], List[float]]] = {}  # key -> (bucket counts, [sum, count])
+
+    def observe(self, value: float, **labels) -> None:
+        k = _key(labels)
+        with self._lock:
+            counts, agg = self._values.setdefault(k, ([0] * len(self.buckets), [0.0, 0]))
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    counts[i] += 1
+                    break
+            agg[0] += value
+            agg[1] += 1
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(c), list(a)) for k, (c, a) in self._values.items()]
+        lines = []
+        for k, counts, (total, n) in items:
+            cumulative = 0
+            for b, c in zip(self.buckets, counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{_fmt_labels(k, ('le', _fmt_value(b)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_fmt_labels(k)} {_fmt_value(total)}")
+            lines.append(f"{self.name}_count{_fmt_labels(k)} {n}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render_prometheus() -> str:
+    return "\n".join(m.render() for m in REGISTRY) + "\n"
+
+
+# ---------- metrics ----------
+STAGE_SECONDS = Histogram("sle_stage_duration_seconds", "Time spent in each pipeline stage.")
+HTTP_REQUEST_SECONDS = Histogram("sle_http_request_duration_seconds", "HTTP request latency.")
+ENCODE_BATCH_SIZE = Histogram(
+    "sle_query_encode_batch_size", "Queries per micro-batched forward pass.", buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+CHUNKS_INGESTED = Counter("sle_chunks_ingested_total", "Chunks stored and indexed by /upload.")
+PAGES_INGESTED = Counter("sle_pages_ingested_total", "PDF pages processed by /upload.")
+TOKENS = Counter("sle_llm_tokens_total", "LLM tokens reported by the provider.")
+CACHE_HITS = Counter("sle_cache_hits_total", "Cache hits by cache name.")
+CACHE_MISSES = Counter("sle_cache_misses_total", "Cache misses by cache name.")
+INDEX_SIZE = Gauge("sle_vector_index_size", "Vectors currently held in the FAISS index.")
+MEMORY_RSS = Gauge("sle_process_resident_memory_bytes", "Resident set size of this process.")
+
+
+def _rss_bytes() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return float(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource  # POSIX only
+    except ImportError:
+        # no cheap RSS source (e.g. Windows); the gauge skips the sample
+        raise RuntimeError("process RSS is not available on this platform") from None
+    # ru_maxrss is the peak, in KiB on Linux; best effort elsewhere
+    return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+
+
+MEMORY_RSS.set_function(_rss_bytes)
+
+
+# ---------- per-request profiling ----------
+# Holds a mutable dict so stages timed in worker threads land in the same profile.
+_profile: ContextVar[Optional[Dict[str, list]]] = ContextVar("sle_profile", default=None)
+
+
+def start_profile():
+    """Begin collecting a stage breakdown for the current request. Returns a reset token."""
+    return _profile.set({})
+
+
+def end_profile(token) -> Dict[str, list]:
+    prof = _profile.get() or {}
+    _profile.reset(token)
+    return prof
+
+
+def server_timing_header(profile: Dict[str, list]) -> str:
+    """Format a profile as a `Server-Timing` header value (durations in ms)."""
+    parts = []
+    for name, (total, n) in profile.items():
+        parts.append(f'{name};dur={total * 1000:.2f};desc="n={n}"')
+    return ", ".join(parts)
+
+
+@contextmanager
+def stage(name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        dt = time.perf_counter() - t0
+        STAGE_SECONDS.observe(dt, stage=name)
+        prof = _profile.get()
+        if prof is not None:
+            entry = prof.setdefault(name, [0.0, 0])
+            entry[0] += dt
+            entry[1] += 1
@@ -1,19 +1,21 @@
 import os
-from typing import List, Dict, Any
+from typing import Iterable, Iterator, List, Dict, Any, Optional
 
 from dotenv import load_dotenv
 load_dotenv()  # loads .env from project root
 
 from openai import OpenAI
-from app.embeddings import vector_store
+from app.embeddings import MULTILINGUAL, VectorStore, vector_store
+from app.lazy_translation import translate_results
+from app.metrics import TOKENS, stage
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 
-def generate_answer(question: str, retrieved: List[Dict[str, Any]]) -> str:
+def build_prompt(question: str, retrieved: List[Dict[str, Any]]) -> str:
     context = "\n\n".join([f"[score={c['score']:.3f}] {c['text']}" for c in retrieved])
 
-    prompt = (
+    return (
         "You are a research paper assistant.\n"
         "Answer using ONLY the provided context.\n"
         "If the answer is not in the context, say: 'Not found in the provided papers.'\n\n"
@@ -21,18 +23,65 @@ def generate_answer(question: str, retrieved: List[Dict[str, Any]]) -> str:
         f"QUESTION:\n{question}"
     )
 
-    response = client.responses.create(
-        model="gpt-5",
-        input=prompt,
-    )
 
+def _record_usage(usage) -> None:
+    if usage is not None:
+        TOKENS.inc(getattr(usage, "input_tokens", 0) or 0, kind="input")
+        TOKENS.inc(getattr(usage, "output_tokens", 0) or 0, kind="output")
+
+
+def generate_answer(question: str, retrieved: List[Dict[str, Any]]) -> str:
+    prompt = build_prompt(question, retrieved)
+
+    with stage("llm.generate"):
+        response = client.responses.create(
+            model="gpt-5",
+            input=prompt,
+        )
+
+    _record_usage(getattr(response, "usage", None))
     return (response.output_text or "").strip()
 
 
-def answer_question(question: str, top_k: int = 5) -> Dict[str, Any]:
-    retrieved = vector_store.search(question, top_k=top_k)
+def stream_answer(question: str, retrieved: List[Dict[str, Any]]) -> Iterator[str]:
+    """Like generate_answer, but yields text deltas as the model produces them."""
+    prompt = build_prompt(question, retrieved)
+
+    with stage("llm.generate"):
+        events = client.responses.create(
+            model="gpt-5",
+            input=prompt,
+            stream=True,
+        )
+        for event in events:
+            if event.type == "response.output_text.delta":
+                yield event.delta
+            elif event.type == "response.completed":
+                _record_usage(getattr(event.response, "usage", None))
+
+
+def answer_question(
+    question: str,
+    top_k: int = 5,
+    paper_ids: Optional[Iterable[str]] = None,
+    store: Optional[VectorStore] = None,
+    stream: bool = False,
+) -> Dict[str, Any]:
+    """
+    Retrieve from `store` (default: the global store), optionally only within
+    `paper_ids`, and answer. With stream=True "answer" is an iterator of text
+    deltas; the LLM is not called until it is consumed.
+    """
+    store = store if store is not None else vector_store
+    retrieved = store.search(question, top_k=top_k, paper_ids=paper_ids)
     if not retrieved:
         return {"answer": "Not found in the provided papers.", "sources": []}
 
+    if MULTILINGUAL:
+        # the index holds original-language text; give the LLM (and sources) English
+        retrieved = translate_results(retrieved)
+
+    if stream:
+        return {"answer": stream_answer(question, retrieved), "sources": retrieved}
     answer = generate_answer(question, retrieved)
     return {"answer": answer, "sources": retrieved}
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.database import get_db
 from app.models import User
-from app.core.security import hash_password, verify_password, create_access_token
+from app.core.security import BcryptBusy, hash_password_async, verify_password_async, create_access_token
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -16,21 +17,40 @@ class LoginRequest(BaseModel):
     email: EmailStr
     password: str
 
+def _find_user(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+def _busy() -> HTTPException:
+    return HTTPException(status_code=503, detail="Too many auth requests, retry shortly", headers={"Retry-After": "1"})
+
+# async endpoints: bcrypt runs on its own executor and the short DB calls are
+# offloaded, so a login burst never holds the threadpool that serves /ask.
 @router.post("/register")
-def register(req: RegisterRequest, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == req.email).first():
+async def register(req: RegisterRequest, db: Session = Depends(get_db)):
+    if await run_in_threadpool(_find_user, db, req.email):
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    user = User(email=req.email, hashed_password=hash_password(req.password))
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        hashed = await hash_password_async(req.password)
+    except BcryptBusy:
+        raise _busy()
+
+    def _create():
+        user = User(email=req.email, hashed_password=hashed)
+        db.add(user)
+        db.commit()
+
+    await run_in_threadpool(_create)
     return {"message": "Registered successfully"}
 
 @router.post("/login")
-def login(req: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == req.email).first()
-    if not user or not verify_password(req.password, user.hashed_password):
+async def login(req: LoginRequest, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_find_user, db, req.email)
+    try:
+        ok = user is not None and await verify_password_async(req.password, user.hashed_password)
+    except BcryptBusy:
+        raise _busy()
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token(user.id)
@@ -0,0 +1,86 @@
+import json
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.dependencies import get_current_user_id
+from app.database import SessionLocal, get_db
+from app.embeddings import vector_store
+from app.models import Paper, PaperChunk
+
+
+# Bulk export of the whole corpus (text, translations, vectors): logged-in users only
+router = APIRouter(prefix="/export", tags=["export"], dependencies=[Depends(get_current_user_id)])
+
+_COLUMNS = (
+    PaperChunk.id,
+    Paper.paper_id,
+    PaperChunk.chunk_id,
+    PaperChunk.section,
+    PaperChunk.page_start,
+    PaperChunk.page_end,
+    PaperChunk.lang,
+    PaperChunk.text_original,
+    PaperChunk.text_en,
+    PaperChunk.embedding_id,
+)
+
+
+def iter_chunk_rows(
+    paper_pk: Optional[int],
+    after_id: int,
+    page_size: int,
+    include_vectors: bool,
+) -> Iterator[str]:
+    """
+    Yield NDJSON lines for paper_chunks in primary-key order.
+
+    Keyset pagination (id > last seen id) keeps every page an index range scan,
+    and selecting plain columns keeps the session's identity map empty, so
+    memory stays flat however many rows are exported.
+    """
+    db = SessionLocal()  # own session: the request-scoped one is closed once streaming starts
+    try:
+        last_id = after_id
+        while True:
+            q = db.query(*_COLUMNS).join(Paper, Paper.id == PaperChunk.paper_id_fk).filter(PaperChunk.id > last_id)
+            if paper_pk is not None:
+                q = q.filter(PaperChunk.paper_id_fk == paper_pk)
+            page = q.order_by(PaperChunk.id).limit(page_size).all()
+            if not page:
+                break
+
+            for row in page:
+                record = dict(row._mapping)
+                if include_vectors:
+                    vec = vector_store.vector_for(row.id)
+                    record["vector"] = vec.tolist() if vec is not None else None
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+
+            last_id = page[-1].id
+            db.rollback()  # end the read transaction between pages
+    finally:
+        db.close()
+
+
+@router.get("/chunks")
+def export_chunks(
+    paper_id: Optional[str] = Query(None, description="Limit to one paper (public paper_id)"),
+    after_id: int = Query(0, ge=0, description="Resume after this chunk id (last `id` received)"),
+    page_size: int = Query(1000, ge=1, le=10000),
+    include_vectors: bool = Query(False, description="Add each chunk's vector from the index"),
+    db: Session = Depends(get_db),
+):
+    paper_pk = None
+    if paper_id is not None:
+        paper = db.query(Paper.id).filter(Paper.paper_id == paper_id).first()
+        if not paper:
+            raise HTTPException(status_code=404, detail="Paper not found.")
+        paper_pk = paper.id
+
+    return StreamingResponse(
+        iter_chunk_rows(paper_pk, after_id, page_size, include_vectors),
+        media_type="application/x-ndjson",
+    )
@@ -2,6 +2,8 @@
 from typing import Dict, Optional
 from transformers import MarianMTModel, MarianTokenizer
 
+from app.metrics import CACHE_HITS, CACHE_MISSES
+
 # Add more languages as you need
 # NOTE: Marian models exist for many pairs; we map only a few common ones.
 MARIAN_MODELS: Dict[str, str] = {
@@ -23,8 +25,10 @@ class TranslatorToEnglish:
             return None
 
         if lang in self._cache:
+            CACHE_HITS.inc(cache="translator_model")
             return self._cache[lang]
 
+        CACHE_MISSES.inc(cache="translator_model")
         tok = MarianTokenizer.from_pretrained(model_name)
         model = MarianMTModel.from_pretrained(model_name)
         self._cache[lang] = (tok, model)
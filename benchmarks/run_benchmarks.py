@@ -0,0 +1,384 @@
+# run_benchmarks.py
+"""
+End-to-end benchmarks for the ingest (/upload) and query (/ask) paths.
+
+    python -m benchmarks.run_benchmarks --pdfs 20 --pages 5 \
+        --scales 10000,100000,1000000 --index ivf,hnsw --out bench.json
+
+Runs fully offline: translation and the LLM client are stubbed and the
+database is a throwaway SQLite file. Only the sentence-transformer is real,
+so it must already be in the local Hugging Face cache.
+
+Ingest is measured by calling the real `upload_paper` route with timing
+wrappers around each of its stages. For the query benchmarks the index is
+padded with clustered synthetic vectors up to each scale; their metadata
+points back at the ingested chunks so `/ask` still does real DB lookups.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.synthetic_pdfs import make_corpus
+
+QUERIES = [
+    "What is the main contribution of the paper?",
+    "Which dataset is used for evaluation?",
+    "How does the method reduce training time?",
+    "What are the limitations of the experiments?",
+    "How does the approach compare with the baselines?",
+    "How much memory does the model need?",
+]
+
+
+# ---------- stubs & timing ----------
+class StubTranslator:
+    """Stands in for TranslatorToEnglish so no MarianMT model is downloaded."""
+
+    def translate(self, text: str, lang: str) -> str:
+        return text
+
+
+class _StubResponses:
+    def create(self, model: str, input: str):
+        return SimpleNamespace(output_text="Stubbed answer.")
+
+
+class StubLLMClient:
+    """Mimics the slice of the OpenAI client used by app.qa."""
+
+    def __init__(self):
+        self.responses = _StubResponses()
+
+
+class StageTimer:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def reset(self) -> None:
+        self.samples.clear()
+
+    def wrap(self, stage: str, fn: Callable) -> Callable:
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - t0)
+        return timed
+
+    def summary(self, wall_s: float) -> Dict[str, Any]:
+        out = {}
+        for stage, vals in self.samples.items():
+            total = sum(vals)
+            out[stage] = {
+                "calls": len(vals),
+                "total_s": round(total, 4),
+                "share_of_wall": round(total / wall_s, 4) if wall_s else None,
+            }
+        return out
+
+
+class _TimedIndex:
+    """Proxy around a faiss index that times `add` (SWIG objects can't be patched)."""
+
+    def __init__(self, index, timer: StageTimer):
+        self._index = index
+        self._add = timer.wrap("index_add", index.add)
+
+    def add(self, x):
+        return self._add(x)
+
+    def __getattr__(self, name):
+        return getattr(self._index, name)
+
+
+def percentiles_ms(samples_s: List[float]) -> Dict[str, float]:
+    arr = np.asarray(samples_s, dtype="float64") * 1000.0
+    return {
+        "n": int(arr.size),
+        "mean": round(float(arr.mean()), 3),
+        "p50": round(float(np.percentile(arr, 50)), 3),
+        "p90": round(float(np.percentile(arr, 90)), 3),
+        "p99": round(float(np.percentile(arr, 99)), 3),
+        "max": round(float(arr.max()), 3),
+    }
+
+
+def _time_calls(fn: Callable, args_list: List[Any]) -> List[float]:
+    out = []
+    for args in args_list:
+        t0 = time.perf_counter()
+        fn(*args)
+        out.append(time.perf_counter() - t0)
+    return out
+
+
+# ---------- ingest ----------
+def bench_ingest(corpus, timer: StageTimer) -> Dict[str, Any]:
+    from fastapi import UploadFile
+
+    from app.database import SessionLocal
+    from app.embeddings import model, vector_store
+    from app import ingest
+    from app.routes import papers
+
+    translator = StubTranslator()
+    translator.translate = timer.wrap("translate", translator.translate)
+    ingest.translator = translator
+    ingest.detect_language = timer.wrap("langdetect", ingest.detect_language)
+    papers.extract_text_by_page = timer.wrap("extract", papers.extract_text_by_page)
+    model.encode = timer.wrap("encode", model.encode)
+    vector_store.index = _TimedIndex(vector_store.index, timer)
+
+    timer.reset()
+    total_pages = 0
+    total_chunks = 0
+    total_bytes = 0
+    per_upload: List[float] = []
+
+    wall0 = time.perf_counter()
+    for filename, data in corpus:
+        db = SessionLocal()
+        db.commit = timer.wrap("db_write", db.commit)
+        db.flush = timer.wrap("db_write", db.flush)
+        db.refresh = timer.wrap("db_write", db.refresh)
+        try:
+            t0 = time.perf_counter()
+            res = asyncio.run(papers.upload_paper(file=UploadFile(file=io.BytesIO(data), filename=filename), db=db, user_id=None))
+            per_upload.append(time.perf_counter() - t0)
+        finally:
+            db.close()
+        total_pages += res["pages"]
+        total_chunks += res["chunks_indexed"]
+        total_bytes += len(data)
+    wall = time.perf_counter() - wall0
+
+    return {
+        "pdfs": len(corpus),
+        "pages": total_pages,
+        "chunks": total_chunks,
+        "wall_s": round(wall, 4),
+        "pages_per_s": round(total_pages / wall, 2),
+        "chunks_per_s": round(total_chunks / wall, 2),
+        "mb_per_s": round(total_bytes / wall / 1e6, 3),
+        "upload_latency_ms": percentiles_ms(per_upload),
+        "stages": timer.summary(wall),
+    }
+
+
+# ---------- query ----------
+def clustered_vectors(n: int, centers: np.ndarray, rng: np.random.Generator, noise: float = 0.35) -> np.ndarray:
+    """Unit vectors drawn around `centers`, roughly mimicking topical embedding clusters."""
+    labels = rng.integers(0, len(centers), size=n)
+    x = centers[labels] + noise * rng.standard_normal((n, centers.shape[1])).astype("float32")
+    x = np.ascontiguousarray(x, dtype="float32")
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return x
+
+
+def build_scaled_store(n_total: int, base_store, centers: np.ndarray, rng: np.random.Generator, batch: int = 100_000):
+    """A VectorStore holding the real ingested vectors padded with synthetic ones up to `n_total`."""
+    from app.embeddings import VectorStore
+
+    n_real = base_store.index.ntotal
+    if not n_real:
+        raise RuntimeError("ingest produced no chunks; nothing to point synthetic vectors at")
+
+    store = VectorStore(dim=base_store.dim)
+    store.index.add(base_store.index.reconstruct_n(0, n_real))
+    store.items.extend(base_store.items)
+    store.texts.extend(base_store.texts)
+
+    remaining = max(0, n_total - n_real)
+    while remaining > 0:
+        m = min(batch, remaining)
+        store.index.add(clustered_vectors(m, centers, rng))
+        for _ in range(m):
+            j = len(store.items) % n_real
+            store.items.append(base_store.items[j])
+            store.texts.append(base_store.texts[j])
+        remaining -= m
+    return store
+
+
+def build_candidate_index(kind: str, vectors: np.ndarray, args):
+    import faiss
+
+    dim = vectors.shape[1]
+    if kind == "ivf":
+        nlist = args.nlist or max(16, int(4 * np.sqrt(len(vectors))))
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        train_n = min(len(vectors), nlist * 64)
+        index.train(vectors[:train_n])
+        index.add(vectors)
+        index.nprobe = args.nprobe
+        return index, {"nlist": nlist, "nprobe": args.nprobe}
+    if kind == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, args.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efSearch = args.ef_search
+        index.add(vectors)
+        return index, {"M": args.hnsw_m, "efSearch": args.ef_search}
+    raise ValueError(f"unknown index kind: {kind}")
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    hits = 0
+    for t, f in zip(truth, found):
+        hits += len(set(t.tolist()) & set(f.tolist()))
+    return hits / truth.size
+
+
+def bench_query_scale(n_total: int, base_store, centers, rng, args) -> Dict[str, Any]:
+    from app import qa
+    from app.database import SessionLocal
+    from app.routes import papers
+
+    t0 = time.perf_counter()
+    store = build_scaled_store(n_total, base_store, centers, rng)
+    build_s = time.perf_counter() - t0
+
+    papers.vector_store = store
+    qa.vector_store = store
+    qa.client = StubLLMClient()
+
+    k = args.top_k
+    texts = [(QUERIES[i % len(QUERIES)],) for i in range(args.queries)]
+    q_vecs = clustered_vectors(args.queries, centers, rng)
+
+    result: Dict[str, Any] = {"n_chunks": int(store.index.ntotal), "build_s": round(build_s, 3), "latency_ms": {}}
+
+    result["latency_ms"]["index_search"] = percentiles_ms(
+        _time_calls(lambda v: store.index.search(v, k), [(q_vecs[i:i + 1],) for i in range(len(q_vecs))])
+    )
+    result["latency_ms"]["vector_store_search"] = percentiles_ms(
+        _time_calls(lambda q: store.search(q, top_k=k), texts)
+    )
+
+    db = SessionLocal()
+    try:
+        result["latency_ms"]["ask"] = percentiles_ms(
+            _time_calls(lambda q: papers.ask(papers.AskRequest(query=q, top_k=k), db), texts)
+        )
+    finally:
+        db.close()
+
+    result["latency_ms"]["answer_question_stub_llm"] = percentiles_ms(
+        _time_calls(lambda q: qa.answer_question(q, top_k=k), texts)
+    )
+
+    if args.index:
+        vectors = store.index.reconstruct_n(0, store.index.ntotal)
+        _, truth = store.index.search(q_vecs, k)
+        result["candidates"] = {}
+        for kind in args.index:
+            t0 = time.perf_counter()
+            index, params = build_candidate_index(kind, vectors, args)
+            cand_build = time.perf_counter() - t0
+            _, found = index.search(q_vecs, k)
+            lat = _time_calls(lambda v: index.search(v, k), [(q_vecs[i:i + 1],) for i in range(len(q_vecs))])
+            result["candidates"][kind] = {
+                "params": params,
+                "build_s": round(cand_build, 3),
+                f"recall_at_{k}": round(recall_at_k(truth, found), 4),
+                "search_latency_ms": percentiles_ms(lat),
+            }
+            del index
+        del vectors
+
+    return result
+
+
+# ---------- entrypoint ----------
+def _csv(cast):
+    return lambda s: [cast(x) for x in s.split(",") if x]
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark the ingest and query paths offline.")
+    p.add_argument("--pdfs", type=int, default=10, help="number of synthetic PDFs to ingest")
+    p.add_argument("--pages", type=int, default=5, help="pages per synthetic PDF")
+    p.add_argument("--langs", type=_csv(str), default=["en", "fr", "de", "es", "it"])
+    p.add_argument("--scales", type=_csv(int), default=[10_000, 100_000, 1_000_000],
+                   help="index sizes (chunks) for the query benchmarks")
+    p.add_argument("--queries", type=int, default=200, help="queries per scale")
+    p.add_argument("--top-k", type=int, default=5)
+    p.add_argument("--index", type=_csv(str), default=[],
+                   help="non-flat indexes to compare against flat for recall: ivf,hnsw")
+    p.add_argument("--nlist", type=int, default=0, help="IVF lists (0 = 4*sqrt(n))")
+    p.add_argument("--nprobe", type=int, default=16)
+    p.add_argument("--hnsw-m", type=int, default=32)
+    p.add_argument("--ef-search", type=int, default=64)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", default="bench_results.json")
+    return p.parse_args(argv)
+
+
+def main(argv=None) -> Dict[str, Any]:
+    args = parse_args(argv)
+
+    # Must happen before app.* is imported: app.database and app.qa read these at import time.
+    tmp_dir = tempfile.mkdtemp(prefix="sle_bench_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp_dir}/bench.db"
+    os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+
+    from app.embeddings import _MODEL_NAME, vector_store
+    from app.init_db import init_db
+
+    init_db()
+
+    print(f"generating {args.pdfs} PDFs x {args.pages} pages ({','.join(args.langs)}) ...")
+    corpus = make_corpus(args.pdfs, args.pages, args.langs, seed=args.seed)
+
+    print("ingesting ...")
+    ingest = bench_ingest(corpus, StageTimer())
+    print(f"  {ingest['chunks']} chunks, {ingest['chunks_per_s']} chunks/s")
+
+    base_store = SimpleNamespace(
+        dim=vector_store.dim,
+        index=vector_store.index._index if isinstance(vector_store.index, _TimedIndex) else vector_store.index,
+        items=vector_store.items,
+        texts=vector_store.texts,
+    )
+    rng = np.random.default_rng(args.seed)
+    centers = rng.standard_normal((256, vector_store.dim)).astype("float32")
+
+    queries = []
+    for n in args.scales:
+        print(f"query benchmarks at {n} chunks ...")
+        queries.append(bench_query_scale(n, base_store, centers, rng, args))
+        print(f"  vector_store_search p50={queries[-1]['latency_ms']['vector_store_search']['p50']} ms")
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "embedding_model": _MODEL_NAME,
+            "args": vars(args),
+        },
+        "ingest": ingest,
+        "query": queries,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {args.out}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
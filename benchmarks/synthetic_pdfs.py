@@ -0,0 +1,77 @@
+# synthetic_pdfs.py
+"""
+Synthetic multi-language PDFs for benchmarking the ingest pipeline.
+
+Text is built from small per-language word pools so that langdetect reliably
+picks the intended language. Only Latin-script languages are generated because
+PyMuPDF's base-14 fonts cannot render Devanagari / Cyrillic.
+"""
+import random
+from typing import Dict, List, Tuple
+
+import fitz  # PyMuPDF
+
+WORD_POOLS: Dict[str, List[str]] = {
+    "en": (
+        "the model results show that our method improves accuracy on the benchmark "
+        "dataset while reducing training time and memory we evaluate the approach "
+        "against strong baselines and discuss limitations of the experiments"
+    ).split(),
+    "fr": (
+        "les résultats du modèle montrent que notre méthode améliore la précision sur "
+        "le jeu de données tout en réduisant le temps d'entraînement et la mémoire nous "
+        "évaluons cette approche avec des méthodes de référence et discutons les limites"
+    ).split(),
+    "de": (
+        "die ergebnisse des modells zeigen dass unsere methode die genauigkeit auf dem "
+        "datensatz verbessert und gleichzeitig die trainingszeit und den speicher "
+        "reduziert wir vergleichen den ansatz mit starken verfahren und diskutieren grenzen"
+    ).split(),
+    "es": (
+        "los resultados del modelo muestran que nuestro método mejora la precisión en el "
+        "conjunto de datos mientras reduce el tiempo de entrenamiento y la memoria "
+        "evaluamos el enfoque frente a métodos de referencia y discutimos las limitaciones"
+    ).split(),
+    "it": (
+        "i risultati del modello mostrano che il nostro metodo migliora la precisione sul "
+        "insieme di dati riducendo il tempo di addestramento e la memoria valutiamo "
+        "questo approccio rispetto ai metodi di riferimento e discutiamo i limiti"
+    ).split(),
+}
+
+
+def random_paragraph(lang: str, rng: random.Random, n_words: int = 120) -> str:
+    pool = WORD_POOLS[lang]
+    words = [rng.choice(pool) for _ in range(n_words)]
+    sentences = []
+    for i in range(0, len(words), 15):
+        s = " ".join(words[i:i + 15])
+        sentences.append(s[:1].upper() + s[1:] + ".")
+    return " ".join(sentences)
+
+
+def make_pdf(lang: str, pages: int, rng: random.Random, paragraphs_per_page: int = 4) -> bytes:
+    """Build a PDF with `pages` pages of text in `lang` and return its bytes."""
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        rect = fitz.Rect(50, 50, page.rect.width - 50, page.rect.height - 50)
+        text = "\n\n".join(random_paragraph(lang, rng) for _ in range(paragraphs_per_page))
+        page.insert_textbox(rect, text, fontsize=9, fontname="helv")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_corpus(n_pdfs: int, pages: int, langs: List[str], seed: int = 0) -> List[Tuple[str, bytes]]:
+    """Returns [(filename, pdf_bytes)], cycling through `langs`."""
+    unknown = [l for l in langs if l not in WORD_POOLS]
+    if unknown:
+        raise ValueError(f"unsupported synthetic languages: {unknown}")
+
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(n_pdfs):
+        lang = langs[i % len(langs)]
+        corpus.append((f"synthetic_{i:04d}_{lang}.pdf", make_pdf(lang, pages, rng)))
+    return corpus
@@ -1,11 +1,11 @@
 # streamlit_app.py
-import time
-import json
+import hashlib
+import html
 import streamlit as st
 
-# TODO 1: import your backend pipeline function here
-# Example:
-# from app.rag import answer_question  # <- you will replace this with your actual import
+from app.embeddings import MULTILINGUAL, VectorItem, VectorStore
+from app.ingest import MIN_TEXT_CHARS, build_chunks, embedding_text, extract_text_by_page
+from app.qa import answer_question
 
 
 st.set_page_config(page_title="Scientific Literature Explorer", page_icon="📄", layout="wide")
@@ -48,13 +48,47 @@ with st.sidebar:
     st.subheader(" Suggested questions")
     st.write("- What is the main contribution?\n- What methodology is used?\n- What dataset?\n- What are limitations?\n- Summarize the results table.")
 
+# --- Backend (cached across reruns and sessions) ---
+@st.cache_resource(show_spinner=False)
+def get_store() -> VectorStore:
+    """One in-memory index shared by all sessions; each session searches only its own papers."""
+    return VectorStore()
+
+
+@st.cache_resource(show_spinner=False)
+def index_pdf(content_hash: str, _pdf_bytes: bytes) -> int:
+    """Extract, chunk and embed a PDF into the shared store. Keyed by content hash, so each file is processed once."""
+    pages = extract_text_by_page(_pdf_bytes)
+    if len("\n".join(p for p in pages if p)) < MIN_TEXT_CHARS:
+        return 0
+
+    paper_id = content_hash[:12]
+    records = build_chunks(pages, paper_id, translate=not MULTILINGUAL)
+    get_store().add(
+        [embedding_text(r, MULTILINGUAL) for r in records],
+        [
+            VectorItem(
+                chunk_db_id=None,
+                paper_id=paper_id,
+                chunk_id=r.chunk_id,
+                section=r.section,
+                page_start=r.page_start,
+                page_end=r.page_end,
+                lang=r.lang,
+            )
+            for r in records
+        ],
+    )
+    return len(records)
+
+
 # --- Session state ---
 if "messages" not in st.session_state:
     st.session_state.messages = []
 if "doc_ready" not in st.session_state:
     st.session_state.doc_ready = False
-if "uploaded_files" not in st.session_state:
-    st.session_state.uploaded_files = []
+if "papers" not in st.session_state:
+    st.session_state.papers = {}  # paper_id -> file name
 
 # --- Layout ---
 left, right = st.columns([0.42, 0.58], gap="large")
@@ -64,10 +98,23 @@ with left:
     files = st.file_uploader("Upload one or more research papers (PDF)", type=["pdf"], accept_multiple_files=True)
 
     if files:
-        st.session_state.uploaded_files = files
-        st.session_state.doc_ready = True
-        st.success(f"Loaded {len(files)} PDF(s). You can start asking questions.")
+        papers = {}
+        for f in files:
+            data = f.getvalue()
+            digest = hashlib.sha256(data).hexdigest()
+            with st.spinner(f"Indexing {f.name} ..."):
+                n_chunks = index_pdf(digest, data)
+            if n_chunks:
+                papers[digest[:12]] = f.name
+            else:
+                st.warning(f"Could not extract enough text from {f.name}.")
+        st.session_state.papers = papers
+        st.session_state.doc_ready = bool(papers)
+        if papers:
+            st.success(f"Loaded {len(papers)} PDF(s). You can start asking questions.")
     else:
+        st.session_state.papers = {}
+        st.session_state.doc_ready = False
         st.info("Upload at least one PDF to begin.")
 
     st.divider()
@@ -77,10 +124,10 @@ with left:
         st.experimental_rerun()
 
     # Optional: show file list
-    if st.session_state.uploaded_files:
+    if st.session_state.papers:
         st.write("**Current PDFs:**")
-        for f in st.session_state.uploaded_files:
-            st.write(f"- {f.name}")
+        for name in st.session_state.papers.values():
+            st.write(f"- {name}")
 
 with right:
     st.subheader("2) Ask questions (unlimited)")
@@ -96,14 +143,15 @@ with right:
                         meta = s.get("meta", {})
                         page = meta.get("page", "—")
                         score = meta.get("score", "—")
-                        title = meta.get("title", "")
+                        title = html.escape(str(meta.get("title", "")))
+                        text = html.escape(s.get("text") or "")
 
                         st.markdown(
                             f"""<div class="source-card">
                             <span class="badge">page: {page}</span>
                             <span class="badge">score: {score}</span>
                             <span class="badge">{title}</span>
-                            <div style="margin-top:8px; white-space:pre-wrap;">{s.get("text","")}</div>
+                            <div style="margin-top:8px; white-space:pre-wrap;">{text}</div>
                             </div>""",
                             unsafe_allow_html=True
                         )
@@ -123,22 +171,24 @@ with right:
                 thinking = st.empty()
                 thinking.markdown(" Searching the paper and preparing grounded answer...")
 
-                # TODO 2: call your real function here.
-                # It should return:
-                #   answer: str
-                #   sources: list[ { "text": str, "meta": { "page": int|str, "score": float|str, "title": str } } ]
-                #
-                # Example expected signature:
-                # answer, sources = answer_question(files=st.session_state.uploaded_files,
-                #                                 question=prompt, top_k=top_k)
-                #
-                # For now, placeholder:
-                answer = "⚠️ Hook up your backend function in TODO 2."
-                sources = []
+                # Retrieval is restricted to this session's papers; the LLM call is
+                # deferred until the answer stream is consumed below.
+                result = answer_question(prompt, top_k=top_k, paper_ids=list(st.session_state.papers),
+                                         store=get_store(), stream=True)
+                sources = [
+                    {
+                        "text": r["text"],
+                        "meta": {
+                            "page": r["metadata"].page_start,
+                            "score": round(r["score"], 3),
+                            "title": st.session_state.papers.get(r["metadata"].paper_id, ""),
+                        },
+                    }
+                    for r in result["sources"]
+                ]
 
                 # --- Strict grounding behavior ---
-                # If your retrieval scores are higher-is-better and normalized (0..1), this works well.
-                # Adjust if your scoring uses distance (lower-is-better).
+                # Scores are cosine similarities (normalized inner product), higher is better.
                 best_score = None
                 if sources:
                     try:
@@ -146,19 +196,22 @@ with right:
                     except Exception:
                         best_score = None
 
+                thinking.empty()
+                out = st.empty()
                 if strict_mode and (not sources or (best_score is not None and best_score < min_score)):
                     answer = ("I couldn’t find strong evidence for that question in the uploaded PDF(s). "
                               "Try rephrasing, or ask something more specific (section name, method, dataset, etc.).")
                     sources = []
-
-                # --- Streaming effect (simple but premium) ---
-                thinking.empty()
-                out = st.empty()
-                acc = ""
-                for ch in answer:
-                    acc += ch
-                    out.markdown(acc)
-                    time.sleep(0.004)
+                    out.markdown(answer)
+                elif isinstance(result["answer"], str):
+                    answer = result["answer"]
+                    out.markdown(answer)
+                else:
+                    # --- Stream tokens as the model produces them ---
+                    answer = ""
+                    for delta in result["answer"]:
+                        answer += delta
+                        out.markdown(answer)
 
                 # Save assistant message
                 st.session_state.messages.append({
@@ -0,0 +1,121 @@
+import json
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import fitz  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.bulk_import import Checkpoint, rollback_pending  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.ingest import process_pdf_file  # noqa: E402
+from app.models import Paper, PaperChunk  # noqa: E402
+
+
+def _write_pdf(path, lines):
+    doc = fitz.open()
+    page = doc.new_page()
+    for i, line in enumerate(lines):
+        page.insert_text((36, 36 + 12 * i), line, fontsize=9)
+    doc.save(str(path))
+    doc.close()
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    ckpt = Checkpoint(path)
+    assert (ckpt.done, ckpt.failed, ckpt.next_shard, ckpt.pending) == (set(), set(), 0, [])
+
+    ckpt.done.add("a.pdf")
+    ckpt.failed.add("b.pdf")
+    ckpt.next_shard = 3
+    ckpt.pending = ["p1"]
+    ckpt.save()
+
+    again = Checkpoint(path)
+    assert (again.done, again.failed, again.next_shard, again.pending) == ({"a.pdf"}, {"b.pdf"}, 3, ["p1"])
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_checkpoint_keeps_failures_out_of_done(tmp_path):
+    root = str(tmp_path)
+    ckpt = Checkpoint(str(tmp_path / "checkpoint.json"))
+
+    ckpt.mark([
+        {"path": os.path.join(root, "ok.pdf"), "records": [object()]},
+        {"path": os.path.join(root, "dup.pdf"), "records": []},
+        {"path": os.path.join(root, "sub", "bad.pdf"), "records": [], "error": "worker died"},
+    ], root)
+    assert ckpt.done == {"ok.pdf", "dup.pdf"}
+    assert ckpt.failed == {os.path.join("sub", "bad.pdf")}
+
+    # a retry that succeeds moves the file over
+    ckpt.mark([{"path": os.path.join(root, "sub", "bad.pdf"), "records": [object()]}], root)
+    assert os.path.join("sub", "bad.pdf") in ckpt.done
+    assert ckpt.failed == set()
+
+
+def test_rollback_pending_after_crash_following_write_shard(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    # p0 belongs to an earlier, checkpointed batch; p1 and p2 to the interrupted one
+    for pid in ("p0", "p1", "p2"):
+        paper = Paper(paper_id=pid, title=f"{pid}.pdf", source="bulk")
+        db.add(paper)
+        db.flush()
+        db.add_all(PaperChunk(paper_id_fk=paper.id, chunk_id=f"{pid}_{n:04d}", text_original="x") for n in (1, 2))
+    db.commit()
+
+    prefix = str(tmp_path / "shard_000001")
+    for ext in (".npy", ".jsonl"):
+        open(prefix + ext, "w").close()
+    open(str(tmp_path / "shard_000000.npy"), "w").close()
+
+    ckpt_path = str(tmp_path / "checkpoint.json")
+    ckpt = Checkpoint(ckpt_path)
+    ckpt.done = {"p0.pdf"}
+    ckpt.next_shard = 1
+    ckpt.pending = ["p1", "p2"]
+    ckpt.save()
+
+    removed = rollback_pending(db, Checkpoint(ckpt_path), prefix)
+
+    assert removed == 2
+    assert [p.paper_id for p in db.query(Paper)] == ["p0"]
+    assert {c.chunk_id for c in db.query(PaperChunk)} == {"p0_0001", "p0_0002"}
+    assert not os.path.exists(prefix + ".npy") and not os.path.exists(prefix + ".jsonl")
+    assert os.path.exists(str(tmp_path / "shard_000000.npy"))
+    with open(ckpt_path, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["pending"] == [] and saved["done"] == ["p0.pdf"] and saved["next_shard"] == 1
+    db.close()
+
+
+def test_process_pdf_file_chunks_a_pdf(tmp_path):
+    path = tmp_path / "paper.pdf"
+    line = "Graph neural networks propagate features along the edges of a graph."
+    _write_pdf(path, [line] * 30)
+
+    res = process_pdf_file(str(path), translate=False)
+
+    assert "error" not in res
+    assert res["pages"] == 1
+    assert res["title"] == "paper.pdf"
+    assert len(res["paper_id"]) == 12
+    assert len(res["records"]) == 2
+    assert [r.chunk_id for r in res["records"]] == [f"{res['paper_id']}_0001", f"{res['paper_id']}_0002"]
+    assert all(r.lang == "en" and r.text_en == r.text_original for r in res["records"])
+
+
+def test_process_pdf_file_reports_errors(tmp_path):
+    short = tmp_path / "short.pdf"
+    _write_pdf(short, ["too short"])
+    broken = tmp_path / "broken.pdf"
+    broken.write_bytes(b"not a pdf")
+
+    assert process_pdf_file(str(short))["error"] == "not enough text"
+    res = process_pdf_file(str(broken))
+    assert res["error"].startswith("extract failed") and res["records"] == []
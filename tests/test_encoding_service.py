@@ -0,0 +1,87 @@
+import threading
+
+import numpy as np
+import pytest
+
+from app.encoding_service import BatchingEncoder
+
+
+def _run_concurrently(encoder, texts):
+    results, errors = {}, {}
+    start = threading.Barrier(len(texts))
+
+    def call(i, text):
+        start.wait()
+        try:
+            results[i] = encoder.encode(text, timeout=5)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=call, args=(i, t)) for i, t in enumerate(texts)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+    return results, errors
+
+
+def test_concurrent_callers_share_a_batch():
+    batches = []
+
+    def encode_fn(texts):
+        batches.append(list(texts))
+        return np.array([[len(t)] for t in texts], dtype="float32")
+
+    encoder = BatchingEncoder(encode_fn, max_batch_size=32, max_wait_ms=200)
+    texts = ["x" * (i + 1) for i in range(8)]
+    results, errors = _run_concurrently(encoder, texts)
+
+    assert not errors
+    assert len(batches) < len(texts)  # at least some callers were batched together
+    assert sum(len(b) for b in batches) == len(texts)
+    for i, text in enumerate(texts):
+        assert results[i][0] == len(text)  # each caller got its own row
+
+
+def test_max_batch_size_is_respected():
+    batches = []
+
+    def encode_fn(texts):
+        batches.append(len(texts))
+        return np.zeros((len(texts), 2), dtype="float32")
+
+    encoder = BatchingEncoder(encode_fn, max_batch_size=3, max_wait_ms=200)
+    results, errors = _run_concurrently(encoder, [str(i) for i in range(10)])
+
+    assert not errors
+    assert len(results) == 10
+    assert max(batches) <= 3
+
+
+def test_exception_reaches_every_waiter():
+    def encode_fn(texts):
+        raise ValueError("boom")
+
+    encoder = BatchingEncoder(encode_fn, max_batch_size=8, max_wait_ms=100)
+    results, errors = _run_concurrently(encoder, ["a", "b", "c", "d"])
+
+    assert not results
+    assert len(errors) == 4
+    assert all(isinstance(e, ValueError) for e in errors.values())
+
+
+def test_short_encoder_output_fails_every_waiter():
+    def encode_fn(texts):
+        return np.zeros((len(texts) - 1, 2), dtype="float32")
+
+    encoder = BatchingEncoder(encode_fn, max_batch_size=8, max_wait_ms=200)
+    results, errors = _run_concurrently(encoder, ["a", "b", "c"])
+
+    assert not results
+    assert len(errors) == 3  # nobody is left blocked
+    assert all(isinstance(e, RuntimeError) for e in errors.values())
+
+
+def test_rejects_non_positive_batch_size():
+    with pytest.raises(ValueError):
+        BatchingEncoder(lambda texts: texts, max_batch_size=0)
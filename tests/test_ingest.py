@@ -0,0 +1,51 @@
+import pytest
+
+from app import ingest
+from app.ingest import build_chunks, simple_chunk
+
+
+@pytest.mark.parametrize("length", [50, 150, 300, 1200, 1500, 5000])
+def test_simple_chunk_terminates_and_covers_text(length):
+    text = ("abcdefghij" * (length // 10 + 1))[:length]
+    chunks = simple_chunk(text, max_chars=1200, overlap=200)
+
+    assert chunks[0] == text[:1200]
+    assert chunks[-1].endswith(text[-50:])
+    assert len(chunks) == max(1, -(-(length - 200) // 1000))
+
+
+def test_simple_chunk_overlaps_consecutive_chunks():
+    text = "".join(chr(ord("a") + i % 26) for i in range(2500))
+    chunks = simple_chunk(text, max_chars=1000, overlap=100)
+
+    assert [len(c) for c in chunks] == [1000, 1000, 700]
+    for prev, cur in zip(chunks, chunks[1:]):
+        assert prev[-100:] == cur[:100]
+
+
+def test_simple_chunk_empty():
+    assert simple_chunk("") == []
+    assert simple_chunk("   \n ") == []
+
+
+def test_build_chunks_numbers_chunks_across_pages(monkeypatch):
+    monkeypatch.setattr(ingest, "detect_language", lambda text, default="en": "fr" if "bonjour" in text else "en")
+    monkeypatch.setattr(ingest.translator, "translate", lambda text, lang: f"[{lang}] {text}")
+    pages = ["hello " * 300, "", "bonjour " * 10]
+
+    records = build_chunks(pages, "p1")
+
+    assert [r.chunk_id for r in records] == ["p1_0001", "p1_0002", "p1_0003"]
+    assert [r.page_start for r in records] == [1, 1, 3]
+    assert records[0].text_en == records[0].text_original
+    assert records[-1].lang == "fr"
+    assert records[-1].text_en == "[fr] " + records[-1].text_original
+
+
+def test_build_chunks_without_translation_leaves_text_en_empty(monkeypatch):
+    monkeypatch.setattr(ingest, "detect_language", lambda text, default="en": "de")
+
+    records = build_chunks(["guten tag " * 10], "p2", translate=False)
+
+    assert len(records) == 1
+    assert records[0].text_en is None